@@ -15,9 +15,17 @@ SWITCH_SETTINGS = {
     'debounce_time': 0.05,  # デバウンス時間 (秒)
 }
 
+# 受信設定
+RECEIVE_SETTINGS = {
+    'dot_dash_threshold': 0.25,  # 短点/長点の判定閾値 (秒)
+    'char_gap': 1.0,             # 文字区切りとみなすLOW持続時間 (秒)
+}
+
 # Webアプリケーション設定
 WEB_CONFIG = {
     'host': '0.0.0.0',    # ホストIP
     'port': 5000,         # ポート番号
-    'debug': False        # デバッグモード
+    'debug': False,       # デバッグモード
+    'status_ttl': 0.05,   # /api/status 応答のキャッシュ有効時間 (秒)
+    'stream_coalesce': 0.01  # この時間内に続いた受信信号はまとめて配信 (秒)
 }
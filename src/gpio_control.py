@@ -3,16 +3,48 @@ GPIO制御モジュール
 シンプルGPIO信号通信システム
 """
 
+import os
 import time
+import logging
+import select
 import threading
+from collections import deque
 from datetime import datetime
-try:
-    import RPi.GPIO as GPIO
-except ImportError:
-    print("警告: RPi.GPIOがインポートできません。シミュレーションモードで動作します。")
-    GPIO = None
 
-from config.settings import GPIO_PINS, SWITCH_SETTINGS
+from config.settings import GPIO_PINS, SWITCH_SETTINGS, RECEIVE_SETTINGS
+from .gpio_events import request_line_events, read_line_event
+
+logger = logging.getLogger(__name__)
+
+GPIO = None  # RPi.GPIO (実機モードでのみ遅延インポート)
+_gpio_import_failed = False  # インポート失敗を記録し、警告と再試行を繰り返さない
+
+# 判定用の時間 (設定値を整数ナノ秒に変換)
+_DOT_DASH_THRESHOLD_NS = int(RECEIVE_SETTINGS['dot_dash_threshold'] * 1e9)  # これ未満のHIGHを短点とみなす
+_CHAR_GAP_NS = int(RECEIVE_SETTINGS['char_gap'] * 1e9)  # これを超えてLOWが続けば文字区切り
+_DEBOUNCE_NS = int(SWITCH_SETTINGS['debounce_time'] * 1e9)  # スイッチ状態が静定するまでの時間
+
+
+def _load_gpio():
+    """
+    RPi.GPIOを遅延インポート
+    Returns:
+        module: RPi.GPIOモジュール。インポートできない場合はNone
+    """
+    global GPIO, _gpio_import_failed
+    if GPIO is None and not _gpio_import_failed:
+        try:
+            import RPi.GPIO as gpio
+        except ImportError:
+            _gpio_import_failed = True
+            print("警告: RPi.GPIOがインポートできません。シミュレーションモードで動作します。")
+            return None
+        GPIO = gpio
+    return GPIO
+
+
+def _ignore_output(pin, value):
+    """シミュレーション用の出力 (何もしない)"""
 
 
 class GPIOController:
@@ -24,12 +56,15 @@ class GPIOController:
         Args:
             simulation_mode (bool): シミュレーションモードフラグ
         """
-        self.simulation_mode = simulation_mode or GPIO is None
+        self.simulation_mode = simulation_mode or _load_gpio() is None
         self.pins = GPIO_PINS
-        self.received_signals = []  # 受信した信号のリスト
+        self.received_signals = deque(maxlen=20)  # 受信した信号 (最新20件のみ保持)
         self.running = False
-        self.transmit_thread = None
-        self.receive_thread = None
+        self.monitor_thread = None
+        self.signal_listeners = ()  # 信号受信時に呼び出すコールバック (登録時に差し替え)
+        self._state_lock = threading.Lock()  # start/stop/コールバック登録の排他
+        self._stop_r = None  # 停止通知用パイプ (読み出し側)
+        self._stop_w = None  # 停止通知用パイプ (書き込み側)
 
         if not self.simulation_mode:
             try:
@@ -58,96 +93,247 @@ class GPIOController:
 
     def start(self):
         """通信開始"""
-        if self.running:
-            return
-
-        self.running = True
-        self.transmit_thread = threading.Thread(target=self._transmit_loop, daemon=True)
-        self.receive_thread = threading.Thread(target=self._receive_loop, daemon=True)
-        self.transmit_thread.start()
-        self.receive_thread.start()
+        with self._state_lock:
+            if self.running:
+                return
+
+            self.running = True
+            self._stop_r, self._stop_w = os.pipe()
+            event_fds = self._open_line_events()
+            if event_fds:
+                # エッジイベントが使える場合はpoll()で待機
+                self.monitor_thread = threading.Thread(target=self._event_loop, args=event_fds, daemon=True)
+            else:
+                self.monitor_thread = threading.Thread(target=self._poll_loop, daemon=True)
+            self.monitor_thread.start()
         print("GPIO通信を開始しました")
 
     def stop(self):
         """通信停止"""
-        self.running = False
-        if self.transmit_thread:
-            self.transmit_thread.join(timeout=1.0)
-        if self.receive_thread:
-            self.receive_thread.join(timeout=1.0)
+        with self._state_lock:
+            self.running = False
+            if self._stop_w is not None:
+                os.write(self._stop_w, b'\0')
+            if self.monitor_thread:
+                self.monitor_thread.join(timeout=1.0)
+            if self._stop_w is not None:
+                os.close(self._stop_r)
+                os.close(self._stop_w)
+                self._stop_r = self._stop_w = None
         print("GPIO通信を停止しました")
 
-    def _transmit_loop(self):
-        """送信ループ: スイッチ押下で送信ピンをHIGH"""
-        while self.running:
-            if not self.simulation_mode:
-                switch_state = GPIO.input(self.pins['switch'])
-                transmit_state = GPIO.LOW if switch_state == GPIO.HIGH else GPIO.HIGH  # スイッチがLOW(押下)ならHIGH
-                GPIO.output(self.pins['transmit'], transmit_state)
-            time.sleep(0.01)  # 10ms polling
-
-    def _receive_loop(self):
-        """受信ループ: 受信ピンの状態変化を検知し、モールス符号を解釈"""
-        last_state = GPIO.LOW if not self.simulation_mode else 0
+    def _open_line_events(self):
+        """
+        スイッチ/受信ピンのエッジイベントを要求
+        Returns:
+            tuple: (スイッチfd, 受信fd)。利用できない場合はNone
+        """
+        if self.simulation_mode:
+            return None
+
+        fds = []
+        try:
+            for name in ('switch', 'receive'):
+                fds.append(request_line_events(self.pins[name]))
+        except OSError as e:
+            for fd in fds:
+                os.close(fd)
+            print(f"GPIOイベントが利用できないため、ポーリングで動作します: {e}")
+            return None
+        return tuple(fds)
+
+    def _event_loop(self, switch_fd, receive_fd):
+        """イベントループ: スイッチ/受信ピンのエッジをpoll()で待機"""
+        stop_r = self._stop_r
+        poller = select.poll()
+        for fd in (switch_fd, receive_fd, stop_r):
+            poller.register(fd, select.POLLIN)
+
+        # ループ内で繰り返し参照する値をローカルに束縛
+        switch_pin = self.pins['switch']
+        transmit_pin = self.pins['transmit']
+        read_pin = GPIO.input
+        write_pin = GPIO.output
+        high, low = GPIO.HIGH, GPIO.LOW
+        transmit_for = {high: low, low: high}  # スイッチがLOW(押下)なら送信ピンをHIGH
+        now_ns = time.monotonic_ns
+        record_signal = self._record_signal
+        wait_events = poller.poll
+
         signal_start = None
         current_morse = ""
-        last_signal_time = time.time()
+        switch_deadline = now_ns()  # スイッチ状態を送信ピンへ反映する時刻 (起動時は即時)
+        char_deadline = None  # 文字区切りとみなす時刻 (time.monotonic_ns)
 
-        while self.running:
-            if not self.simulation_mode:
-                current_state = GPIO.input(self.pins['receive'])
-            else:
-                current_state = 0  # シミュレーションでは常にLOW
+        try:
+            while True:
+                deadlines = [d for d in (switch_deadline, char_deadline) if d is not None]
+                timeout = None
+                if deadlines:
+                    timeout = max(0, min(deadlines) - now_ns()) / 1e6
+
+                for fd, _ in wait_events(timeout):
+                    if fd == stop_r:
+                        return
 
-            current_time = time.time()
+                    # タイムスタンプはカーネルが記録したエッジ時刻 (ns)
+                    timestamp, rising = read_line_event(fd)
+                    if fd == switch_fd:
+                        # エッジのたびに反映を先送りし、静定してから一度だけ出力 (デバウンス)
+                        switch_deadline = now_ns() + _DEBOUNCE_NS
+                    elif rising:
+                        # HIGH信号開始
+                        signal_start = timestamp
+                        char_deadline = None
+                    elif signal_start is not None:
+                        # HIGH信号終了
+                        current_morse = record_signal(timestamp - signal_start, current_morse)
+                        signal_start = None
+                        char_deadline = now_ns() + _CHAR_GAP_NS
+
+                now = now_ns()
+                if switch_deadline is not None and now >= switch_deadline:
+                    write_pin(transmit_pin, transmit_for[read_pin(switch_pin)])
+                    switch_deadline = None
+                if char_deadline is not None and now >= char_deadline:
+                    # 一定時間以上LOWで文字区切り
+                    logger.info("文字完了: %s", current_morse)
+                    current_morse = ""
+                    char_deadline = None
+        finally:
+            os.close(switch_fd)
+            os.close(receive_fd)
+
+    def _poll_loop(self):
+        """ポーリングループ: スイッチ/受信ピンを10ms周期で監視 (エッジイベントが使えない場合)"""
+        receive_pin = self.pins['receive']
+        switch_pin = self.pins['switch']
+        transmit_pin = self.pins['transmit']
+
+        # ループ内で繰り返し参照する値をローカルに束縛
+        if self.simulation_mode:
+            # シミュレーションでは受信ピンは常にLOW、スイッチは常に未押下
+            read_pin = {receive_pin: 0, switch_pin: 1}.__getitem__
+            write_pin = _ignore_output
+            high, low = 1, 0
+        else:
+            read_pin = GPIO.input
+            write_pin = GPIO.output
+            high, low = GPIO.HIGH, GPIO.LOW
+        transmit_for = {high: low, low: high}  # スイッチがLOW(押下)なら送信ピンをHIGH
+        now_ns = time.monotonic_ns
+        record_signal = self._record_signal
 
+        # 停止通知パイプを待機しつつ10ms周期で起床
+        poller = select.poll()
+        poller.register(self._stop_r, select.POLLIN)
+        wait_stop = poller.poll
+
+        last_switch_state = read_pin(switch_pin)
+        last_switch_change = now_ns() - _DEBOUNCE_NS  # 起動時の状態は即時反映
+        applied_switch_state = None  # 送信ピンへ反映済みのスイッチ状態
+
+        last_state = low
+        signal_start = None
+        current_morse = ""
+        last_signal_time = now_ns()
+
+        while True:
+            current_time = now_ns()
+
+            # 送信: スイッチ状態を送信ピンへ反映 (変化のたびに先送りするデバウンス)
+            switch_state = read_pin(switch_pin)
+            if switch_state != last_switch_state:
+                last_switch_state = switch_state
+                last_switch_change = current_time
+            elif switch_state != applied_switch_state and current_time - last_switch_change >= _DEBOUNCE_NS:
+                write_pin(transmit_pin, transmit_for[switch_state])
+                applied_switch_state = switch_state
+
+            # 受信: 受信ピンの状態変化を検知し、モールス符号を解釈
+            current_state = read_pin(receive_pin)
             if current_state != last_state:
-                if current_state == GPIO.HIGH:
+                if current_state == high:
                     # HIGH信号開始
                     signal_start = current_time
                 else:
                     # HIGH信号終了
-                    if signal_start:
-                        duration = current_time - signal_start
-                        # 短点/長点判定
-                        if duration < 0.25:
-                            morse_char = "・"  # 短点
-                        else:
-                            morse_char = "－"  # 長点
-
-                        current_morse += morse_char
-                        print(f"受信信号: {morse_char} (持続時間: {duration:.2f}秒)")
-
-                        # モールス文字を記録
-                        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-                        self.received_signals.append({
-                            'timestamp': timestamp,
-                            'signal': morse_char,
-                            'morse': current_morse
-                        })
-
-                        # 最新20件のみ保持
-                        if len(self.received_signals) > 20:
-                            self.received_signals.pop(0)
-
+                    if signal_start is not None:
+                        current_morse = record_signal(current_time - signal_start, current_morse)
                         signal_start = None
                         last_signal_time = current_time
 
             # LOW信号の持続時間をチェック（文字間隔判定）
-            elif current_state == GPIO.LOW and signal_start is None:
+            elif current_state == low and signal_start is None:
                 low_duration = current_time - last_signal_time
-                if low_duration > 1.0 and current_morse:  # 1秒以上LOWで文字区切り
-                    print(f"文字完了: {current_morse}")
+                if low_duration > _CHAR_GAP_NS and current_morse:  # 一定時間以上LOWで文字区切り
+                    logger.info("文字完了: %s", current_morse)
                     # ここで文字を追加（オプション）
                     current_morse = ""
                     last_signal_time = current_time
 
             last_state = current_state
-            time.sleep(0.01)  # 10ms polling
+            if wait_stop(10):  # 10ms polling
+                return
+
+    def _record_signal(self, duration_ns, current_morse):
+        """
+        HIGH信号を短点/長点に分類して記録
+        Args:
+            duration_ns (int): HIGH信号の持続時間 (ナノ秒)
+            current_morse (str): 受信中のモールス符号
+        Returns:
+            str: 信号を追加したモールス符号
+        """
+        # 短点/長点判定
+        if duration_ns < _DOT_DASH_THRESHOLD_NS:
+            morse_char = "・"  # 短点
+        else:
+            morse_char = "－"  # 長点
+
+        current_morse += morse_char
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("受信信号: %s (持続時間: %.2f秒)", morse_char, duration_ns / 1e9)
+
+        # モールス文字を記録 (時刻の整形は取得時まで遅延)
+        entry = (time.time_ns(), morse_char, current_morse)
+        self.received_signals.append(entry)
+
+        # 整形は通知先で行う (監視スレッドでは記録した値をそのまま渡す)
+        for listener in self.signal_listeners:
+            listener(entry)
+
+        return current_morse
+
+    @staticmethod
+    def format_signal(entry):
+        """
+        記録した信号を表示用の辞書に変換
+        Args:
+            entry (tuple): (受信時刻[ns], 信号, モールス符号)
+        Returns:
+            dict: timestamp/signal/morse を持つ辞書
+        """
+        timestamp_ns, morse_char, morse = entry
+        return {
+            'timestamp': datetime.fromtimestamp(timestamp_ns / 1e9).strftime('%H:%M:%S.%f')[:-3],
+            'signal': morse_char,
+            'morse': morse
+        }
+
+    def add_signal_listener(self, callback):
+        """
+        信号受信時のコールバックを登録
+        Args:
+            callback (callable): 記録した信号 (受信時刻[ns], 信号, モールス符号) を受け取る関数 (監視スレッドから呼ばれる)
+        """
+        with self._state_lock:
+            self.signal_listeners = self.signal_listeners + (callback,)
 
     def get_received_signals(self):
         """受信した信号を取得"""
-        return self.received_signals.copy()
+        # 監視スレッドが並行して追記するため、先に一括コピーしてから整形
+        return [self.format_signal(entry) for entry in list(self.received_signals)]
 
     def get_switch_state(self):
         """スイッチの状態を取得"""
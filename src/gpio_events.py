@@ -0,0 +1,59 @@
+"""
+GPIOラインイベントモジュール
+/dev/gpiochip キャラクタデバイスからエッジイベントを取得する (linux/gpio.h v1 ABI)
+"""
+
+import os
+import fcntl
+import struct
+
+# linux/gpio.h の定数
+_GPIOHANDLE_REQUEST_INPUT = 1 << 0
+_GPIOEVENT_REQUEST_BOTH_EDGES = (1 << 0) | (1 << 1)
+_GPIOEVENT_EVENT_RISING_EDGE = 0x01
+_GPIO_GET_LINEEVENT_IOCTL = 0xC030B404  # _IOWR(0xB4, 0x04, struct gpioevent_request)
+
+# struct gpioevent_request / struct gpioevent_data
+_EVENT_REQUEST = struct.Struct('III32si')
+_EVENT_DATA = struct.Struct('QI4x')
+
+DEFAULT_CHIP = '/dev/gpiochip0'
+
+
+def request_line_events(offset, label='simple_signal', chip=DEFAULT_CHIP):
+    """
+    指定ラインの両エッジイベントを要求
+    Args:
+        offset (int): GPIOライン番号 (BCM番号)
+        label (str): コンシューマラベル
+        chip (str): GPIOチップデバイスパス
+    Returns:
+        int: イベント読み出し用ファイルディスクリプタ
+    Raises:
+        OSError: デバイスが利用できない場合
+    """
+    req = bytearray(_EVENT_REQUEST.pack(
+        offset,
+        _GPIOHANDLE_REQUEST_INPUT,
+        _GPIOEVENT_REQUEST_BOTH_EDGES,
+        label.encode('ascii')[:31],
+        -1
+    ))
+    chip_fd = os.open(chip, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        fcntl.ioctl(chip_fd, _GPIO_GET_LINEEVENT_IOCTL, req, True)
+    finally:
+        os.close(chip_fd)
+    return _EVENT_REQUEST.unpack(req)[4]
+
+
+def read_line_event(fd):
+    """
+    エッジイベントを1件読み出し
+    Args:
+        fd (int): request_line_events() が返したファイルディスクリプタ
+    Returns:
+        tuple: (カーネルタイムスタンプ[ns], 立ち上がりエッジならTrue)
+    """
+    timestamp, event_id = _EVENT_DATA.unpack(os.read(fd, _EVENT_DATA.size))
+    return timestamp, event_id == _GPIOEVENT_EVENT_RISING_EDGE
@@ -5,6 +5,7 @@
 
 import sys
 import signal
+import logging
 import argparse
 from pathlib import Path
 
@@ -71,6 +72,12 @@ def main():
     # 引数解析
     args = parse_arguments()
 
+    # ログ設定 (受信信号ごとの詳細はデバッグモードでのみ出力)
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
+
     # Webアプリ初期化
     web_app = SimpleWebApp(simulation_mode=args.simulation)
 
@@ -3,12 +3,56 @@ Flask Webアプリケーションモジュール
 シンプルGPIO信号通信システムのWeb UIを提供
 """
 
-from flask import Flask, render_template, jsonify
+from flask import Flask, Response, render_template, request
+from werkzeug.serving import WSGIRequestHandler
 import os
+import socket
+import json
+import hashlib
+import time
+import queue
+import logging
+import threading
+
+try:
+    from orjson import dumps as _dumps
+except ImportError:
+    def _dumps(obj):
+        """オブジェクトをJSONバイト列に変換 (orjsonが無い環境向け)"""
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
 
 from config.settings import WEB_CONFIG
 from .gpio_control import GPIOController
 
+logger = logging.getLogger(__name__)
+
+# プロジェクトルートとテンプレート/静的ファイルのパス
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_TEMPLATE_DIR = os.path.join(_PROJECT_ROOT, 'templates')
+_STATIC_DIR = os.path.join(_PROJECT_ROOT, 'static')
+
+_STATUS_TTL_NS = int(WEB_CONFIG['status_ttl'] * 1e9)
+_STREAM_KEEPALIVE = 15.0  # ストリームのキープアライブ間隔 (秒)
+_STREAM_QUEUE_SIZE = 256  # クライアントごとの未送信イベント上限
+_STREAM_COALESCE = WEB_CONFIG['stream_coalesce']
+
+# 内容が変わらない応答は起動時にエンコードしておく
+_START_OK = _dumps({'success': True, 'message': '通信を開始しました'})
+_STOP_OK = _dumps({'success': True, 'message': '通信を停止しました'})
+
+
+def _json_response(body, status=200):
+    """JSONバイト列からレスポンスを生成"""
+    return Response(body, status=status, mimetype='application/json')
+
+
+class _NoDelayRequestHandler(WSGIRequestHandler):
+    """TCP_NODELAYを有効にしたリクエストハンドラ (小さな応答が遅延ACKで待たされるのを防ぐ)"""
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
 
 class SimpleWebApp:
     """シンプル信号通信Webアプリケーション"""
@@ -19,61 +63,171 @@ class SimpleWebApp:
         Args:
             simulation_mode (bool): シミュレーションモードフラグ
         """
-        # プロジェクトルートを取得
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-        self.app = Flask(__name__,
-                        template_folder=os.path.join(project_root, 'templates'),
-                        static_folder=os.path.join(project_root, 'static'))
+        self.app = Flask(__name__, template_folder=_TEMPLATE_DIR, static_folder=_STATIC_DIR)
         self.app.secret_key = 'simple_signal_secret_key'
         self.simulation_mode = simulation_mode
 
         # GPIOコントローラー初期化
         self.gpio_controller = GPIOController(simulation_mode)
 
+        # 描画済みのメインページ (内容は起動後に変わらないため初回描画を再利用)
+        self._index_html = None
+
+        # ステータス応答のキャッシュ (生成時刻[monotonic_ns], JSONバイト列, ETag)
+        self._status_cache = (None, None, None)
+
+        # 受信信号ストリームの購読キュー
+        self._stream_queues = set()
+        self._stream_lock = threading.Lock()
+        self.dropped_events = 0  # 送信待ち超過で破棄したイベント数
+        self._overflowed_queues = set()  # 破棄を警告済みのクライアント
+        self.gpio_controller.add_signal_listener(self._publish_signal)
+
         # ルート設定
         self._setup_routes()
 
     def _setup_routes(self):
         """ルート設定"""
 
-        @self.app.route('/')
         def index():
             """メインページ"""
-            return render_template('index.html', status={'simulation_mode': self.simulation_mode})
+            if self._index_html is None or self.app.debug:
+                html = render_template('index.html', status={'simulation_mode': self.simulation_mode})
+                self._index_html = html.encode('utf-8')
+            return Response(self._index_html, mimetype='text/html')
 
-        @self.app.route('/api/start', methods=['POST'])
         def start_communication():
             """通信開始"""
             try:
                 self.gpio_controller.start()
-                return jsonify({'success': True, 'message': '通信を開始しました'})
+                self._status_cache = (None, None, None)
+                return _json_response(_START_OK)
             except Exception as e:
-                return jsonify({'success': False, 'error': str(e)}), 500
+                return _json_response(_dumps({'success': False, 'error': str(e)}), 500)
 
-        @self.app.route('/api/stop', methods=['POST'])
         def stop_communication():
             """通信停止"""
             try:
                 self.gpio_controller.stop()
-                return jsonify({'success': True, 'message': '通信を停止しました'})
+                self._status_cache = (None, None, None)
+                return _json_response(_STOP_OK)
             except Exception as e:
-                return jsonify({'success': False, 'error': str(e)}), 500
+                return _json_response(_dumps({'success': False, 'error': str(e)}), 500)
 
-        @self.app.route('/api/status')
         def get_status():
-            """ステータス取得"""
-            return jsonify({
-                'simulation_mode': self.simulation_mode,
-                'running': self.gpio_controller.running,
-                'switch_state': self.gpio_controller.get_switch_state()
-            })
-
-        @self.app.route('/api/signals')
+            """ステータス取得 (短時間はキャッシュ済みの応答を返す)"""
+            now = time.monotonic_ns()
+            cached_at, body, etag = self._status_cache
+            if cached_at is None or now - cached_at >= _STATUS_TTL_NS:
+                body = _dumps({
+                    'simulation_mode': self.simulation_mode,
+                    'running': self.gpio_controller.running,
+                    'switch_state': self.gpio_controller.get_switch_state()
+                })
+                etag = hashlib.sha1(body).hexdigest()
+                self._status_cache = (now, body, etag)
+
+            # 内容が変わっていなければ本文なしの304を返す
+            response = _json_response(body)
+            response.set_etag(etag)
+            return response.make_conditional(request)
+
         def get_signals():
             """受信信号取得"""
             signals = self.gpio_controller.get_received_signals()
-            return jsonify({'signals': signals})
+            return _json_response(_dumps({'signals': signals}))
+
+        def stream_signals():
+            """受信信号のストリーム配信 (Server-Sent Events)"""
+            events = queue.Queue(maxsize=_STREAM_QUEUE_SIZE)
+
+            def generate():
+                # 購読の登録と解除は同じtry/finally内で行う (HEADなど本文を送らない要求では登録しない)
+                with self._stream_lock:
+                    self._stream_queues.add(events)
+                    # 登録と同じロック内で履歴を取得
+                    history = list(self.gpio_controller.received_signals)
+                # 履歴へ追記済みで通知前だった信号はキューからも届く。監視スレッドは1つなので
+                # 重複しうるのは履歴末尾の1件が最初に届く場合のみ (同一オブジェクトかで判定)
+                duplicate = history[-1] if history else None
+                try:
+                    # 接続直後に再接続間隔と履歴を送出
+                    yield (b'retry: 3000\n\nevent: history\ndata: '
+                           + _dumps([GPIOController.format_signal(entry) for entry in history])
+                           + b'\n\n')
+                    while True:
+                        try:
+                            entry = events.get(timeout=_STREAM_KEEPALIVE)
+                        except queue.Empty:
+                            # 切断検知を兼ねたキープアライブ
+                            yield b': keepalive\n\n'
+                            continue
+                        if duplicate is not None:
+                            is_duplicate = entry is duplicate
+                            duplicate = None
+                            if is_duplicate:
+                                continue
+
+                        # 続けて届いたイベントは1回の書き込みにまとめる
+                        chunk = [entry]
+                        deadline = time.monotonic() + _STREAM_COALESCE
+                        while True:
+                            remaining = deadline - time.monotonic()
+                            if remaining <= 0:
+                                break
+                            try:
+                                chunk.append(events.get(timeout=remaining))
+                            except queue.Empty:
+                                break
+                        yield b''.join(
+                            b'data: ' + _dumps(GPIOController.format_signal(entry)) + b'\n\n'
+                            for entry in chunk
+                        )
+                finally:
+                    with self._stream_lock:
+                        self._stream_queues.discard(events)
+                        self._overflowed_queues.discard(events)
+
+            return Response(generate(), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+        # ルート表から一括登録 (自動OPTIONSハンドラは生成しない)
+        routes = (
+            ('/', index, ['GET']),
+            ('/api/start', start_communication, ['POST']),
+            ('/api/stop', stop_communication, ['POST']),
+            ('/api/status', get_status, ['GET']),
+            ('/api/signals', get_signals, ['GET']),
+            ('/api/stream', stream_signals, ['GET']),
+        )
+        self.app.url_map.strict_slashes = False
+        for rule, view_func, methods in routes:
+            self.app.add_url_rule(rule, view_func=view_func, methods=methods,
+                                  provide_automatic_options=False)
+
+    def _publish_signal(self, entry):
+        """
+        受信信号をストリーム購読中のクライアントへ配信
+        Args:
+            entry (tuple): 記録した信号 (整形・エンコードは各クライアントの送信側で行う)
+        """
+        newly_overflowed = 0
+        with self._stream_lock:
+            for events in self._stream_queues:
+                # 監視スレッドを待たせないよう、滞留したクライアント分は破棄
+                try:
+                    events.put_nowait(entry)
+                except queue.Full:
+                    self.dropped_events += 1
+                    if events not in self._overflowed_queues:
+                        self._overflowed_queues.add(events)
+                        newly_overflowed += 1
+            dropped_events = self.dropped_events
+
+        # 警告はクライアントごとに初回のみ、ロック解放後に出す
+        if newly_overflowed:
+            logger.warning("ストリームの送信待ちが上限に達したためイベントを破棄しました (クライアント: %d, 累計: %d)",
+                           newly_overflowed, dropped_events)
 
     def run(self, host=None, port=None, debug=None):
         """アプリケーション実行"""
@@ -85,7 +239,7 @@ class SimpleWebApp:
         print(f"シミュレーションモード: {self.simulation_mode}")
 
         try:
-            self.app.run(host=host, port=port, debug=debug)
+            self.app.run(host=host, port=port, debug=debug, request_handler=_NoDelayRequestHandler)
         except KeyboardInterrupt:
             print("Webサーバーを停止します")
         finally: